@@ -8,14 +8,89 @@ generate an STL mesh, and export both the STL and the polynomial model JSON.
 This script works standalone or can be imported by another script.
 """
 
+import functools
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Tuple
 
 import numpy as np
 import trimesh
+from scipy import linalg
 
+# Numba is optional: when available, the surface evaluation runs as a fused, parallel kernel
+try:
+    from numba import njit
+    from numba import prange
 
-def build_design_matrix(x: np.ndarray, y: np.ndarray, order: int = 5) -> np.ndarray:
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# The compiled kernel is optional too: build it next to this script with `cythonize -i _poly2d.pyx`
+try:
+    from _poly2d import MAX_ORDER as CYTHON_MAX_ORDER
+    from _poly2d import poly2d as _poly2d_cython
+
+    HAS_CYTHON_KERNEL = True
+except ImportError:
+    HAS_CYTHON_KERNEL = False
+
+
+@functools.lru_cache(maxsize=None)
+def _triangular_indices(order: int) -> np.ndarray:
+    """
+    Exponent pairs (i, j) with i + j <= order, in coefficient order.
+
+    The result is cached per order and read-only; row ``idx`` holds the
+    exponents of ``x`` and ``y`` multiplied by ``coeffs[idx]``.
+    """
+    ij = np.asarray([(i, j) for i in range(order + 1) for j in range(order + 1 - i)], dtype=np.intp)
+    ij.setflags(write=False)
+    return ij
+
+
+def _powers_from_raw(v_raw: np.ndarray, mean: float, std: float, order: int, dtype: type = np.float64) -> np.ndarray:
+    """
+    Build the power table ``P[k] = ((v_raw - mean) / std)**k`` by cumulative multiplication.
+
+    The standardization is written straight into ``P[1]``, so the raw values
+    are read once and no separate normalized array is allocated.
+    """
+    v_raw = np.asarray(v_raw, dtype=np.float64)
+    powers = np.empty((order + 1,) + v_raw.shape, dtype=dtype)
+    powers[0] = 1.0
+    if order >= 1:
+        np.subtract(v_raw, mean, out=powers[1])
+        powers[1] *= 1.0 / std
+        for k in range(2, order + 1):
+            np.multiply(powers[k - 1], powers[1], out=powers[k])
+    return powers
+
+
+def _build_xy_powers(
+    x: np.ndarray, y: np.ndarray, order: int, dtype: type = np.float64
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build power tables ``Xp[i] = x**i`` and ``Yp[j] = y**j`` of normalized coordinates.
+
+    The tables have shape (order+1,) + x.shape and (order+1,) + y.shape, so
+    ``x`` and ``y`` may differ in shape as long as they broadcast together.
+    """
+    return _powers_from_raw(x, 0.0, 1.0, order, dtype), _powers_from_raw(y, 0.0, 1.0, order, dtype)
+
+
+def _design_from_powers(x_powers: np.ndarray, y_powers: np.ndarray, order: int) -> np.ndarray:
+    """Assemble the column-major (N, T) design matrix from 1D power tables."""
+    n_terms = (order + 1) * (order + 2) // 2
+    design = np.empty((x_powers.shape[1], n_terms), dtype=x_powers.dtype, order="F")
+    for col, (i, j) in enumerate(_triangular_indices(order)):
+        np.multiply(x_powers[i], y_powers[j], out=design[:, col])
+    return design
+
+
+def build_design_matrix(x: np.ndarray, y: np.ndarray, order: int = 5, dtype: type = np.float64) -> np.ndarray:
     """
     Build the design matrix for 2D polynomial least-squares fitting.
 
@@ -25,17 +100,152 @@ def build_design_matrix(x: np.ndarray, y: np.ndarray, order: int = 5) -> np.ndar
         Normalized coordinates.
     order : int, optional
         Polynomial total order (default: 5).
+    dtype : type, optional
+        Data type of the matrix (default: float64). ``np.float32`` halves
+        its memory footprint for large inputs.
 
     Returns
     -------
     ndarray
         Vandermonde-like matrix of shape (N, (order+1)(order+2)/2).
     """
-    terms = []
-    for i in range(order + 1):
-        for j in range(order + 1 - i):
-            terms.append((x**i) * (y**j))
-    return np.vstack(terms).T
+    x_powers, y_powers = _build_xy_powers(np.ravel(x), np.ravel(y), order, dtype)
+    return _design_from_powers(x_powers, y_powers, order)
+
+
+def solve_least_squares(design: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """
+    Solve the polynomial least-squares problem ``design @ coeffs ~= z``.
+
+    The normal equations are solved with a Cholesky factorization of the
+    (T, T) Gram matrix, which is much cheaper than an SVD of the (N, T)
+    design matrix when N >> T. If the Gram matrix is not numerically
+    positive definite, a pivoted-QR least-squares solve is used instead.
+    The Gram matrix products run in the precision of ``design``; the
+    factorization and solve are always done in float64.
+
+    Parameters
+    ----------
+    design : ndarray
+        Design matrix of shape (N, T) from ``build_design_matrix``.
+    z : ndarray
+        Target values of shape (N,).
+
+    Returns
+    -------
+    ndarray
+        Polynomial coefficients of shape (T,).
+    """
+    z = np.asarray(z, dtype=design.dtype)
+    gram = (design.T @ design).astype(np.float64)
+    rhs = (design.T @ z).astype(np.float64)
+    try:
+        return linalg.cho_solve(linalg.cho_factor(gram), rhs)
+    except linalg.LinAlgError:
+        coeffs, _, _, _ = linalg.lstsq(design, z, lapack_driver="gelsy")
+        return coeffs.astype(np.float64)
+
+
+def subsample_rows(design: np.ndarray, z: np.ndarray, n_rows: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Importance-sample rows of a least-squares system to shrink it before solving.
+
+    Rows are drawn i.i.d. with probability proportional to their squared norm,
+    a cheap proxy for the leverage scores, and rescaled by ``1 / sqrt(n_rows * p_i)``
+    so that the sampled normal equations are an unbiased estimate of the full ones.
+
+    Parameters
+    ----------
+    design : ndarray
+        Design matrix of shape (N, T).
+    z : ndarray
+        Target values of shape (N,).
+    n_rows : int
+        Number of rows to draw.
+    seed : int, optional
+        Seed of the random generator, so that repeated fits are reproducible (default: 0).
+
+    Returns
+    -------
+    design, z : ndarray
+        Sampled and rescaled design matrix and target values.
+    """
+    scores = np.einsum("ij,ij->i", design, design).astype(np.float64)
+    prob = scores / scores.sum()
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(design.shape[0], size=n_rows, replace=True, p=prob)
+    weights = (1.0 / np.sqrt(n_rows * prob[rows])).astype(design.dtype)
+    return design[rows] * weights[:, None], z[rows] * weights
+
+
+def coeffs_to_matrix(coeffs: np.ndarray, order: int = 5) -> np.ndarray:
+    """
+    Reshape flat polynomial coefficients into a dense triangular matrix.
+
+    Parameters
+    ----------
+    coeffs : ndarray
+        Polynomial coefficients ordered as in ``build_design_matrix``.
+    order : int, optional
+        Polynomial order (default: 5).
+
+    Returns
+    -------
+    ndarray
+        Matrix ``C`` of shape (order+1, order+1) where ``C[i, j]`` multiplies
+        ``x**i * y**j``. Entries with ``i + j > order`` are zero.
+    """
+    coeffs = np.asarray(coeffs, dtype=np.float64)
+    ij = _triangular_indices(order)
+    c = np.zeros((order + 1, order + 1))
+    c[ij[:, 0], ij[:, 1]] = coeffs[: len(ij)]
+    return c
+
+
+def _horner_1d(row: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Evaluate sum(row[j] * t**j) with Horner's rule."""
+    r = np.full(t.shape, row[-1])
+    for a in row[-2::-1]:
+        r *= t
+        r += a
+    return r
+
+
+def _eval_from_powers(
+    coeffs: np.ndarray, x_powers: np.ndarray, y_powers: np.ndarray, order: int, out: np.ndarray = None
+) -> np.ndarray:
+    """Accumulate sum(coeffs[idx] * Xp[i] * Yp[j]) from precomputed power tables into ``out``."""
+    shape = np.broadcast_shapes(x_powers.shape[1:], y_powers.shape[1:])
+    if out is None:
+        out = np.empty(shape)
+    out[...] = 0.0
+    term = np.empty(shape)
+    for idx, (i, j) in enumerate(_triangular_indices(order)):
+        np.multiply(x_powers[i], y_powers[j], out=term)
+        term *= coeffs[idx]
+        out += term
+    return out
+
+
+if HAS_NUMBA:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _poly2d_numba(coeffs, x, y, order, out):
+        """Evaluate the polynomial point by point using running powers of x and y."""
+        for k in prange(x.shape[0]):
+            xk = x[k]
+            yk = y[k]
+            acc = 0.0
+            xi = 1.0
+            idx = 0
+            for i in range(order + 1):
+                yj = 1.0
+                for _ in range(order + 1 - i):
+                    acc += coeffs[idx] * xi * yj
+                    yj *= yk
+                    idx += 1
+                xi *= xk
+            out[k] = acc
 
 
 def evaluate_fitted_surface(coeffs: np.ndarray, x: np.ndarray, y: np.ndarray, order: int = 5) -> np.ndarray:
@@ -56,63 +266,121 @@ def evaluate_fitted_surface(coeffs: np.ndarray, x: np.ndarray, y: np.ndarray, or
     ndarray
         Evaluated z values.
     """
-    z = np.zeros_like(x)
-    idx = 0
-    for i in range(order + 1):
-        for j in range(order + 1 - i):
-            z += coeffs[idx] * (x**i) * (y**j)
-            idx += 1
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if HAS_CYTHON_KERNEL and order <= CYTHON_MAX_ORDER:
+        kernel = _poly2d_cython
+    elif HAS_NUMBA:
+        kernel = _poly2d_numba
+    else:
+        kernel = None
+
+    if kernel is not None:
+        x, y = np.broadcast_arrays(x, y)
+        z = np.empty(x.shape)
+        kernel(
+            np.ascontiguousarray(coeffs, dtype=np.float64),
+            np.ascontiguousarray(x).ravel(),
+            np.ascontiguousarray(y).ravel(),
+            order,
+            z.reshape(-1),
+        )
+        return z
+
+    x, y = np.broadcast_arrays(x, y)
+    c = coeffs_to_matrix(coeffs, order)
+
+    # Horner in x over rows, each row being a Horner-evaluated polynomial in y;
+    # only the triangular part of ``c`` is visited
+    z = _horner_1d(c[order, :1], y)
+    for i in range(order - 1, -1, -1):
+        z *= x
+        z += _horner_1d(c[i, : order + 1 - i], y)
     return z
 
 
-def create_polynomial_surface(input_file: str, output_stl: str, output_json: str, order: int = 5) -> None:
+def create_polynomial_surface(
+    input_file: str,
+    output_stl: str,
+    output_json: str,
+    order: int = 5,
+    sample_frac: float = None,
+    low_memory: bool = False,
+) -> None:
     """
     Fit the polynomial surface and export STL + JSON model.
 
     Parameters
     ----------
     input_file : str
-        Path to the .OPT3DMapping file.
+        Path to the .OPT3DMapping file. Lines with fewer than three values are skipped.
     output_stl : str
         Output STL file path.
     output_json : str
         Output polynomial model JSON path.
     order : int, optional
         Polynomial order (default: 5).
+    sample_frac : float, optional
+        Fraction of the input points used to solve the fit, drawn by
+        importance sampling, in the range (0, 1]. By default, all points are used.
+    low_memory : bool, optional
+        Build the design matrix in float32 to halve its memory footprint and
+        bandwidth; the normal equations are still solved in float64
+        (default: False).
     """
-    with open(input_file, "r") as f:
-        lines = f.readlines()[1:]
+    if sample_frac is not None and not 0.0 < sample_frac <= 1.0:
+        raise ValueError(f"sample_frac must be in (0, 1], got {sample_frac}")
 
-    points = [list(map(float, line.strip().split()[:3])) for line in lines if len(line.strip().split()) >= 3]
-    points = np.array(points)
+    # First line holds the point count; only X, Y, Z are needed for the fit.
+    # Lines with fewer than 3 values are skipped, as with the former line-by-line parser.
+    with open(input_file, "r") as f:
+        next(f, None)
+        points = np.loadtxt((line for line in f if len(line.split(None, 3)) >= 3), usecols=range(3), ndmin=2)
     x_raw, y_raw, z = points[:, 0], points[:, 1], points[:, 2]
 
     x_mean, x_std = x_raw.mean(), x_raw.std()
     y_mean, y_std = y_raw.mean(), y_raw.std()
-    x = (x_raw - x_mean) / x_std
-    y = (y_raw - y_mean) / y_std
-
-    X_design = build_design_matrix(x, y, order)
-    coeffs, _, _, _ = np.linalg.lstsq(X_design, z, rcond=None)
-
-    x_grid_raw = np.linspace(x_raw.min(), x_raw.max(), 100)
-    y_grid_raw = np.linspace(y_raw.min(), y_raw.max(), 100)
-    xg_raw, yg_raw = np.meshgrid(x_grid_raw, y_grid_raw)
-    xg = (xg_raw - x_mean) / x_std
-    yg = (yg_raw - y_mean) / y_std
-    zg = evaluate_fitted_surface(coeffs, xg, yg, order)
-
-    vertices = np.stack([xg_raw.flatten(), yg_raw.flatten(), zg.flatten()], axis=1)
-    faces = []
-    res_x, res_y = xg.shape
-    for i in range(res_x - 1):
-        for j in range(res_y - 1):
-            idx = i * res_y + j
-            faces.append([idx, idx + 1, idx + res_y])
-            faces.append([idx + 1, idx + res_y + 1, idx + res_y])
-    mesh = trimesh.Trimesh(vertices=vertices, faces=np.array(faces))
-    mesh.export(output_stl)
-    print(f"[OK] STL exported to: {output_stl}")
+
+    # Standardization is fused into the power tables: no normalized copy of x and y is kept
+    dtype = np.float32 if low_memory else np.float64
+    X_design = _design_from_powers(
+        _powers_from_raw(x_raw, x_mean, x_std, order, dtype),
+        _powers_from_raw(y_raw, y_mean, y_std, order, dtype),
+        order,
+    )
+    if sample_frac is not None and sample_frac < 1.0:
+        n_rows = max(int(sample_frac * len(z)), X_design.shape[1])
+        coeffs = solve_least_squares(*subsample_rows(X_design, z, n_rows))
+    else:
+        coeffs = solve_least_squares(X_design, z)
+
+    # Grid axes are kept 1D, as a (1, nx) row of X and a (ny, 1) column of Y;
+    # only the evaluated Z and the vertex array are materialized in 2D
+    x_grid_raw = np.linspace(x_raw.min(), x_raw.max(), 100).reshape(1, -1)
+    y_grid_raw = np.linspace(y_raw.min(), y_raw.max(), 100).reshape(-1, 1)
+    # The grid is a tensor product, so powers are only needed along each axis
+    xg_powers = _powers_from_raw(x_grid_raw, x_mean, x_std, order)
+    yg_powers = _powers_from_raw(y_grid_raw, y_mean, y_std, order)
+    zg = _eval_from_powers(coeffs, xg_powers, yg_powers, order)
+
+    res_x, res_y = zg.shape
+    vertices = np.empty((zg.size, 3))
+    vertex_grid = vertices.reshape(res_x, res_y, 3)
+    vertex_grid[..., 0] = x_grid_raw
+    vertex_grid[..., 1] = y_grid_raw
+    vertex_grid[..., 2] = zg
+    idx = (np.arange(res_x - 1)[:, None] * res_y + np.arange(res_y - 1)[None, :]).ravel()
+    # Fill each triangle family as its own contiguous block, then join them sequentially
+    tri1 = np.empty((len(idx), 3), dtype=np.int64)
+    tri2 = np.empty((len(idx), 3), dtype=np.int64)
+    tri1[:, 0] = idx
+    tri1[:, 1] = idx + 1
+    tri1[:, 2] = idx + res_y
+    tri2[:, 0] = tri1[:, 1]
+    tri2[:, 1] = idx + res_y + 1
+    tri2[:, 2] = tri1[:, 2]
+    faces = np.concatenate([tri1, tri2], axis=0)
+    mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
 
     model = {
         "order": order,
@@ -127,10 +395,32 @@ def create_polynomial_surface(input_file: str, output_stl: str, output_json: str
         "y_max": float(y_raw.max()),
     }
 
-    os.makedirs(os.path.dirname(output_json), exist_ok=True)
-    with open(output_json, "w", encoding="utf-8") as f:
+    for folder in {os.path.dirname(output_stl), os.path.dirname(output_json)}:
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    # Both exports are disk-bound and independent, so they are overlapped.
+    # The JSON marks a complete export (A_2 only checks that it exists), so it is
+    # removed again if the STL export fails.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        stl_export = executor.submit(mesh.export, output_stl)
+        json_export = executor.submit(_write_json, output_json, model)
+        try:
+            stl_export.result()
+        except Exception:
+            wait([json_export])
+            if os.path.isfile(output_json):
+                os.remove(output_json)
+            raise
+        print(f"[OK] STL exported to: {output_stl}")
+        json_export.result()
+        print(f"[OK] Model JSON exported to: {output_json}")
+
+
+def _write_json(path: str, model: dict) -> None:
+    """Write the polynomial model JSON."""
+    with open(path, "w", encoding="utf-8") as f:
         json.dump(model, f, ensure_ascii=False, indent=2)
-    print(f"[OK] Model JSON exported to: {output_json}")
 
 
 def main():
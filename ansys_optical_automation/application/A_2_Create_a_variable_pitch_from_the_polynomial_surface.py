@@ -12,6 +12,7 @@ Everything can also be executed independently (standalone).
 
 import json
 import os
+from typing import Callable
 from typing import List
 from typing import Tuple
 
@@ -19,7 +20,11 @@ import numpy as np
 
 # Try importing the fitting script
 try:
+    from A_1_Create_stl_polynomial_surface import HAS_CYTHON_KERNEL
+    from A_1_Create_stl_polynomial_surface import HAS_NUMBA
+    from A_1_Create_stl_polynomial_surface import coeffs_to_matrix
     from A_1_Create_stl_polynomial_surface import create_polynomial_surface
+    from A_1_Create_stl_polynomial_surface import evaluate_fitted_surface
 
     print("[INFO] Successfully imported create_polynomial_surface from 1_1_create_stl_polynomial_surface.py")
 except ModuleNotFoundError as e:
@@ -96,37 +101,90 @@ def generate_points(
     if p_start <= 0 or p_end <= 0 or p_y <= 0:
         raise ValueError("All pitch values must be positive.")
 
-    ys = []
-    y = y_min
-    while y <= y_max + eps:
-        ys.append(min(y, y_max))
-        y += p_y
+    ys = _constant_pitch_positions(y_min, y_max, p_y, eps)
     if include_edges and abs(ys[-1] - y_max) > 1e-9:
-        ys.append(y_max)
-
-    X_list, Y_list = [], []
-    for yy in ys:
-        x = x_min
-        row = []
-        while x <= x_max + eps:
-            row.append(min(x, x_max))
-            x += linear_pitch_x(x, x_min, x_max, p_start, p_end)
-        if include_edges and abs(row[-1] - x_max) > 1e-9:
-            row.append(x_max)
-        X_list.extend(row)
-        Y_list.extend([yy] * len(row))
-    return np.asarray(X_list), np.asarray(Y_list)
+        ys = np.append(ys, y_max)
+
+    xs = _variable_pitch_positions(x_min, x_max, p_start, p_end, eps)
+    if include_edges and abs(xs[-1] - x_max) > 1e-9:
+        xs = np.append(xs, x_max)
+
+    # Every row shares the same X positions, so the grid is a plain meshgrid
+    X_grid, Y_grid = np.meshgrid(xs, ys)
+    return X_grid.ravel(), Y_grid.ravel()
+
+
+def _constant_pitch_positions(v_min: float, v_max: float, pitch: float, eps: float) -> np.ndarray:
+    """Positions v_min, v_min + pitch, ... up to v_max (clamped to v_max)."""
+    n = int(np.floor((v_max + eps - v_min) / pitch)) + 1
+    return np.minimum(v_min + pitch * np.arange(max(n, 1)), v_max)
+
+
+def _variable_pitch_positions(x_min: float, x_max: float, p_start: float, p_end: float, eps: float) -> np.ndarray:
+    """
+    Closed-form positions of the recurrence x[k+1] = x[k] + linear_pitch_x(x[k]).
+
+    Inside the domain the pitch is p(x) = a + b * (x - x_min) with a = p_start and
+    b = (p_end - p_start) / (x_max - x_min), so u[k] = x[k] - x_min follows
+    u[k+1] = a + (1 + b) * u[k], u[0] = 0, which gives u[k] = a * ((1 + b)**k - 1) / b.
+    """
+    length = x_max - x_min
+    b = (p_end - p_start) / length if length != 0 else 0.0
+    limit = length + eps
+    if b == 0.0 or 1.0 + b <= 0.0:
+        # Constant pitch, or a first step that already leaves the domain
+        return _constant_pitch_positions(x_min, x_max, p_start, eps)
+
+    log_growth = np.log1p(b)
+    n = int(np.floor(np.log1p(b * limit / p_start) / log_growth)) + 2
+    k = np.arange(max(n, 1))
+    u = p_start * np.expm1(k * log_growth) / b
+    return np.minimum(x_min + u[u <= limit], x_max)
 
 
 def eval_poly2d(coeffs: np.ndarray, x_norm: np.ndarray, y_norm: np.ndarray, order: int) -> np.ndarray:
     """Evaluate z = f(x, y) using polynomial coefficients."""
-    z = np.zeros_like(x_norm)
-    idx = 0
-    for i in range(order + 1):
-        for j in range(order + 1 - i):
-            z += coeffs[idx] * (x_norm**i) * (y_norm**j)
-            idx += 1
-    return z
+    return evaluate_fitted_surface(coeffs, x_norm, y_norm, order)
+
+
+def compile_poly2d(coeffs: np.ndarray, order: int) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+    """
+    Generate an evaluator specialized for one fixed polynomial.
+
+    The 2D Horner scheme is fully unrolled for ``order`` with the coefficients
+    inlined as literals, then compiled with ``exec``. The returned function has
+    no loop over terms: it is a single straight-line numpy expression in x and y.
+
+    Parameters
+    ----------
+    coeffs : ndarray
+        Polynomial coefficients ordered as in ``build_design_matrix``.
+    order : int
+        Polynomial order.
+
+    Returns
+    -------
+    callable
+        Function ``f(x_norm, y_norm)`` returning the evaluated z values.
+    """
+    c = coeffs_to_matrix(coeffs, order)
+
+    def horner(terms: List[str], var: str) -> str:
+        expr = terms[-1]
+        for term in terms[-2::-1]:
+            expr = f"{term} + {var} * ({expr})"
+        return expr
+
+    if order == 0:
+        body = f"np.full(np.broadcast_shapes(np.shape(x), np.shape(y)), {float(c[0, 0])!r})"
+    else:
+        rows = [horner([repr(float(v)) for v in c[i, : order + 1 - i]], "y") for i in range(order + 1)]
+        body = horner([f"({row})" for row in rows], "x")
+
+    source = f"def _eval(x, y):\n    return {body}\n"
+    namespace = {"np": np}
+    exec(compile(source, f"<poly2d order={order}>", "exec"), namespace)
+    return namespace["_eval"]
 
 
 def write_opt3d_mapping(
@@ -142,12 +200,13 @@ def write_opt3d_mapping(
         raise ValueError("Exactly 9 extra constants are required.")
     n = len(X)
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    ffmt = f"{{:{float_fmt}}}"  # noqa: E231
+    # One row format for all lines: three formatted coordinates followed by the constants verbatim
+    row_fmt = " ".join([f"%{float_fmt}"] * 3 + [str(c).replace("%", "%%") for c in extra_constants])
+    values = np.column_stack([X, Y, Z]).ravel().tolist()
+    body = ((row_fmt + "\n") * n) % tuple(values)
     with open(path, "w", encoding="utf-8") as f:
         f.write(f"{n}\n")
-        for x, y, z in zip(X, Y, Z):
-            formatted_values = " ".join([ffmt.format(x), ffmt.format(y), ffmt.format(z)] + extra_constants)
-            f.write(formatted_values + "\n")
+        f.write(body)
 
 
 def ensure_model_json():
@@ -180,7 +239,11 @@ def main():
     X_pts, Y_pts = generate_points((x_min, x_max, y_min, y_max), PITCH_X_START, PITCH_X_END, PITCH_Y, INCLUDE_EDGES)
     x_norm = (X_pts - x_mean) / x_std
     y_norm = (Y_pts - y_mean) / y_std
-    Z_pts = eval_poly2d(coeffs, x_norm, y_norm, order)
+    if HAS_CYTHON_KERNEL or HAS_NUMBA:
+        # A compiled kernel is available: it beats any numpy expression
+        Z_pts = eval_poly2d(coeffs, x_norm, y_norm, order)
+    else:
+        Z_pts = compile_poly2d(coeffs, order)(x_norm, y_norm)
     write_opt3d_mapping(OUTPUT_MAPPING, X_pts, Y_pts, Z_pts, EXTRA_CONSTANTS, FLOAT_FMT)
 
     print(f"[OK] Mapping created: {OUTPUT_MAPPING}")
@@ -0,0 +1,63 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# distutils: extra_compile_args = -O3 -march=native -ffast-math
+
+"""
+Compiled evaluator for the 2D polynomial surfaces of A_1 / A_2.
+
+Optional accelerator for ``evaluate_fitted_surface``. Build it in place with::
+
+    cythonize -i _poly2d.pyx
+
+When the compiled module is not importable, the scripts fall back to numba
+or to the pure numpy implementation.
+"""
+
+cdef enum:
+    _MAX_ORDER = 15
+
+MAX_ORDER = _MAX_ORDER
+
+
+def poly2d(const double[::1] coeffs, const double[::1] x, const double[::1] y, int order, double[::1] out):
+    """
+    Evaluate z = sum(coeffs[idx] * x**i * y**j) for all points into ``out``.
+
+    Parameters
+    ----------
+    coeffs : ndarray
+        Polynomial coefficients ordered as in ``build_design_matrix``.
+    x, y : ndarray
+        Contiguous float64 normalized coordinates of shape (N,).
+    order : int
+        Polynomial order, at most ``MAX_ORDER``.
+    out : ndarray
+        Contiguous float64 output array of shape (N,).
+    """
+    cdef Py_ssize_t k
+    cdef Py_ssize_t n = x.shape[0]
+    cdef int i, j, idx
+    cdef double acc
+    cdef double xi[_MAX_ORDER + 1]
+    cdef double yj[_MAX_ORDER + 1]
+
+    if order < 0 or order > _MAX_ORDER:
+        raise ValueError("Polynomial order must be between 0 and {}.".format(_MAX_ORDER))
+    if coeffs.shape[0] < (order + 1) * (order + 2) // 2:
+        raise ValueError("Not enough coefficients for the polynomial order.")
+    if y.shape[0] != n or out.shape[0] != n:
+        raise ValueError("x, y and out must have the same length.")
+
+    with nogil:
+        for k in range(n):
+            xi[0] = 1.0
+            yj[0] = 1.0
+            for i in range(1, order + 1):
+                xi[i] = xi[i - 1] * x[k]
+                yj[i] = yj[i - 1] * y[k]
+            acc = 0.0
+            idx = 0
+            for i in range(order + 1):
+                for j in range(order + 1 - i):
+                    acc = acc + coeffs[idx] * xi[i] * yj[j]
+                    idx = idx + 1
+            out[k] = acc
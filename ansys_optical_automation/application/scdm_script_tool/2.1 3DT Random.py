@@ -1,3 +1,4 @@
+import bisect
 import ctypes
 import os
 import random
@@ -375,7 +376,7 @@ def process_mapping_file(input_file, control_points, master_name):
     The function:
     1) Reads the mapping file and parses X values.
     2) Normalizes X by the maximum X found.
-    3) Interpolates a probability from control_points for each line.
+    3) Interpolates a probability from control_points for all lines.
     4) Keeps a line if random.random() >= probability.
     5) Writes a new file with the filtered lines and returns its path.
 
@@ -406,16 +407,13 @@ def process_mapping_file(input_file, control_points, master_name):
         x = float(parts[0])
         parsed.append((x, line))
 
-    # Normalize X by maximum
+    # Normalize X by maximum and interpolate all probabilities in one pass
     x_max = max([x for x, _ in parsed])
-    filtered_lines = []
+    probabilities = interpolate_probabilities([x / x_max for x, _ in parsed], control_points)
 
-    # Probabilistic filtering per normalized X
-    for x, line in parsed:
-        x_norm = x / x_max
-        p = interpolate_probability(x_norm, control_points)
-        if random.random() >= p:
-            filtered_lines.append(line)
+    # Probabilistic filtering per normalized X, with the generator method bound once
+    draw = random.random
+    filtered_lines = [line for (_, line), p in zip(parsed, probabilities) if draw() >= p]
 
     new_count = len(filtered_lines)
 
@@ -423,11 +421,9 @@ def process_mapping_file(input_file, control_points, master_name):
     points_str = "_".join(["p{:.1f}-{:.1f}".format(p, x * 100) for x, p in control_points])
     output_file = os.path.join(os.path.dirname(input_file), "{}_{}.OPT3DMapping".format(master_name, points_str))
 
-    # Write new header (count) and kept lines
+    # Write new header (count) and kept lines as a single buffer
     with open(output_file, "w") as f:
-        f.write("{}\n".format(new_count))
-        for line in filtered_lines:
-            f.write(line)
+        f.write("{}\n".format(new_count) + "".join(filtered_lines))
 
     return output_file
 
@@ -452,12 +448,45 @@ def interpolate_probability(x_norm, control_points):
     float
         Interpolated probability in [0..1].
     """
-    for i in range(len(control_points) - 1):
-        x0, p0 = control_points[i]
-        x1, p1 = control_points[i + 1]
-        if x0 <= x_norm <= x1:
-            return p0 + (p1 - p0) * ((x_norm - x0) / (x1 - x0))
-    return control_points[-1][1]
+    return interpolate_probabilities([x_norm], control_points)[0]
+
+
+def interpolate_probabilities(x_norms, control_points):
+    """
+    Linearly interpolate probability values for many normalized x at once.
+
+    Same rule as ``interpolate_probability``, but the surrounding control
+    points are located with a binary search (``bisect``) instead of a linear
+    scan, so N values cost O(N log K) for K control points.
+
+    Parameters
+    ----------
+    x_norms : list of float
+        Normalized x values in [0..1].
+    control_points : list of tuple(float, float)
+        Sorted (x, p) pairs where x in [0..1] and p in [0..1].
+
+    Returns
+    -------
+    list of float
+        Interpolated probabilities in [0..1], one per x value.
+    """
+    xs = [x for x, _ in control_points]
+    ps = [p for _, p in control_points]
+    last_p = ps[-1]
+    if len(xs) < 2:
+        return [last_p] * len(x_norms)
+
+    last_segment = len(xs) - 2
+    probabilities = []
+    for x_norm in x_norms:
+        if x_norm < xs[0] or x_norm > xs[-1]:
+            probabilities.append(last_p)
+            continue
+        i = min(max(bisect.bisect_left(xs, x_norm) - 1, 0), last_segment)
+        x0, x1 = xs[i], xs[i + 1]
+        probabilities.append(ps[i] + (ps[i + 1] - ps[i]) * ((x_norm - x0) / (x1 - x0)))
+    return probabilities
 
 
 # -----------------------------------------------------------------------------